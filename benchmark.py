@@ -0,0 +1,236 @@
+import csv
+import math
+import os
+import time
+from collections import Counter
+from functools import partial
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from PyCrypCli.client import Client
+
+from environment import (
+    BENCHMARK_CLIENTS,
+    BENCHMARK_REPEAT,
+    BENCHMARK_SCALE,
+    RESOURCE_FILE,
+    RESOURCE_INTERVAL,
+    RESOURCE_SAMPLES,
+)
+from histogram import Histogram, WindowedHistograms
+from resources import discover_targets, sample_resources
+from testcase import TestCase
+from timing import format_table, summarize
+from util import get_client
+
+LATENCY_COLUMNS = ["count", "mean ms", "p50 ms", "p95 ms", "p99 ms", "max ms"]
+LOAD_COLUMNS = ["clients", "ops/s", "errors"] + LATENCY_COLUMNS
+
+# slope of log(latency) over log(size) above which an endpoint is considered to scale with its table
+LINEAR_GROWTH_EXPONENT = 0.5
+
+
+def scaled(sizes: List[int]) -> List[int]:
+    return sorted({max(1, int(size * BENCHMARK_SCALE)) for size in sizes})
+
+
+def client_counts() -> List[int]:
+    return [n for n in [1, 2, 4, 8, 16, 32, 64, 128] if n < BENCHMARK_CLIENTS] + [BENCHMARK_CLIENTS]
+
+
+def partition(items: list, clients: List[Client]) -> Dict[Client, list]:
+    step = len(clients)
+    return {client: items[i::step] for i, client in enumerate(clients)}
+
+
+def login_clients(n, username, password) -> List[Client]:
+    clients = []
+    for _ in range(n):
+        clients.append(get_client())
+        clients[-1].login(username, password)
+    return clients
+
+
+class LoadResult:
+    def __init__(self, clients: int):
+        self.clients: int = clients
+        self.latencies: Histogram = Histogram()
+        # latencies of successful operations by the interval since the start of the run in which they finished
+        self.timeline: Optional[WindowedHistograms] = (
+            WindowedHistograms(RESOURCE_INTERVAL) if RESOURCE_SAMPLES else None
+        )
+        self.errors: Counter = Counter()
+        self.duration: float = 0.0
+        self.resources: List[Tuple[float, dict]] = []
+
+    @property
+    def operations(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.duration if self.duration else 0.0
+
+
+def run_load(
+    clients: List[Client], task: Callable[[Client], None], operations: int, interval=0.0, per_client=False
+) -> LoadResult:
+    result = LoadResult(len(clients))
+    remaining = iter(range(operations))
+    lock = Lock()
+
+    def worker(client: Client):
+        # with per_client every client runs `operations` operations instead of taking them from the shared pool
+        own = iter(range(operations))
+        while True:
+            with lock:
+                if next(own if per_client else remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            try:
+                task(client)
+            except Exception as e:
+                with lock:
+                    result.errors[type(e).__name__] += 1
+            else:
+                with lock:
+                    # read under the lock, so operations reach the timeline in the order they finished
+                    end = time.perf_counter()
+                    result.latencies.record(end - start)
+                    if result.timeline is not None:
+                        result.timeline.record("", end - begin, end - start)
+            # pace each client like a game client polling every `interval` seconds
+            time.sleep(max(0.0, start + interval - time.perf_counter()))
+
+    threads = [Thread(target=worker, args=(client,), name=f"client-{i}") for i, client in enumerate(clients)]
+    if RESOURCE_SAMPLES:
+        targets = discover_targets()
+        result.resources.append((0.0, sample_resources(targets)))
+        sampler = Sampler(partial(sample_resources, targets), RESOURCE_INTERVAL)
+        sampler.start()
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.duration = time.perf_counter() - begin
+    if RESOURCE_SAMPLES:
+        sampler.stop()
+        result.resources += sampler.samples
+    return result
+
+
+# histograms are filled from all client threads of a load
+recording: Lock = Lock()
+
+
+def record(latencies: Dict[Any, Histogram], key: Any, seconds: float):
+    with recording:
+        latencies.setdefault(key, Histogram()).record(seconds)
+
+
+def timed(latencies: Dict[str, Histogram], step: str, func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    response = func(*args, **kwargs)
+    record(latencies, step, time.perf_counter() - start)
+    return response
+
+
+class Sampler(Thread):
+    def __init__(self, sample: Callable[[], Any], interval=1.0):
+        super().__init__(daemon=True)
+        self.sample: Callable[[], Any] = sample
+        self.interval: float = interval
+        self.samples: List[Tuple[float, Any]] = []
+        self.stopped: Event = Event()
+
+    def run(self):
+        start = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            self.samples.append((time.perf_counter() - start, self.sample()))
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def growth_exponent(sizes: Sequence[int], latencies: Sequence[float]) -> float:
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(latency, 1e-9)) for latency in latencies]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+class BenchmarkCase(TestCase):
+    def measure(self, func: Callable, repeat: int = BENCHMARK_REPEAT) -> List[float]:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def latency_row(self, latencies: Union[Sequence[float], Histogram]) -> list:
+        stats = summarize(latencies)
+        return [stats["count"]] + [stats[key] * 1000 for key in ["mean", "p50", "p95", "p99", "max"]]
+
+    def load_row(self, result: LoadResult) -> list:
+        return [result.clients, result.throughput, sum(result.errors.values())] + self.latency_row(result.latencies)
+
+    def report_errors(self, title: str, result: LoadResult):
+        rows = [[error, count] for error, count in result.errors.most_common()]
+        self.report(title, ["error", "count"], rows or [["none", 0]])
+        # every load run reports its errors, so the resource usage during the run is reported along with them
+        if result.resources:
+            self.report_resources(title, result)
+
+    def report_resources(self, title: str, result: LoadResult):
+        timeline = []
+        usage: Dict[str, list] = {}
+        # both the windows and the samples are in chronological order, so only one window is decoded at a time
+        windows = result.timeline.windows()
+        pending = next(windows, None)
+        for (last_t, last), (t, current) in zip(result.resources, result.resources[1:]):
+            window = Histogram()
+            # a window belongs to the sample interval that contains its middle
+            while pending is not None and pending[1] + RESOURCE_INTERVAL / 2 < t:
+                if pending[1] + RESOURCE_INTERVAL / 2 >= last_t:
+                    window.merge(pending[2])
+                pending = next(windows, None)
+            for target in sorted(current.keys() & last.keys()):
+                cpu = (current[target][0] - last[target][0]) / (t - last_t) * 100
+                rss, threads, fds = current[target][1:]
+                usage.setdefault(target, []).append((cpu, rss / 2**20, threads, fds))
+                row = [title, t, len(window) / (t - last_t), window.percentile(95) * 1000, target, cpu]
+                timeline.append(row + [rss / 2**20, threads, fds])
+
+        rows = []
+        for target, samples in usage.items():
+            cpus, rss = [sample[0] for sample in samples], [sample[1] for sample in samples]
+            threads, fds = max(sample[2] for sample in samples), max(sample[3] for sample in samples)
+            rows.append([target, sum(cpus) / len(cpus), max(cpus), rss[0], max(rss), rss[-1] - rss[0], threads, fds])
+        self.report(
+            f"{title}: process resources",
+            ["process", "mean cpu %", "max cpu %", "start MiB", "max MiB", "growth MiB", "threads", "fds"],
+            rows,
+        )
+
+        exists = os.path.exists(RESOURCE_FILE)
+        with open(RESOURCE_FILE, "a", newline="") as file:
+            writer = csv.writer(file)
+            if not exists:
+                writer.writerow(["run", "s", "ok/s", "p95 ms", "process", "cpu %", "rss MiB", "threads", "fds"])
+            writer.writerows(timeline)
+
+    def report(self, title: str, columns: List[str], rows: List[list]):
+        print(f"\n{title}\n{format_table(columns, rows)}", flush=True)
+
+    def report_growth(self, title: str, sizes: List[int], mean_latencies: Dict[str, List[float]]):
+        rows = []
+        for endpoint, latencies in mean_latencies.items():
+            exponent = growth_exponent(sizes, latencies)
+            rows.append([endpoint, exponent, "LINEAR" if exponent >= LINEAR_GROWTH_EXPONENT else "ok"])
+        self.report(title, ["endpoint", "exponent", "scaling"], rows)
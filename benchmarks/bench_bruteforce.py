@@ -0,0 +1,85 @@
+import random
+from typing import List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LOAD_COLUMNS, login_clients, run_load, scaled
+from benchmarks.bench_device import seed_devices
+from benchmarks.bench_hardware import seed_workloads
+from benchmarks.bench_service import seed_services
+from database import execute_many
+from environment import BENCHMARK_CLIENTS
+from tests.test_bruteforce import clear_bruteforce_table
+from tests.test_server import setup_account, super_password
+from tests.test_service import create_service
+from util import uuid
+
+# seconds between two status requests of a game client watching its attack
+STATUS_POLL_INTERVAL = 1.0
+# status requests of every attacker during the status phase
+STATUS_POLLS = 5
+
+
+def seed_bruteforce_services(service_uuids: List[str], target_device, target_service):
+    clear_bruteforce_table()
+    execute_many(
+        "INSERT INTO service_bruteforce(uuid, started, target_service, target_device, progress) VALUES(%s,%s,%s,%s,%s)",
+        [(service_uuid, True, target_service, target_device, 1) for service_uuid in service_uuids],
+    )
+
+
+class BenchBruteforce(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchBruteforce"):
+        for client in cls.clients:
+            client.close()
+
+    def test_many_attackers(self):
+        rows = []
+        for attackers in scaled([10, 100, 500]):
+            devices = seed_devices(attackers)
+            seed_workloads(devices)
+            services = seed_services(devices, "bruteforce", speed=1.0)
+            target_device = seed_devices(1, owners=[uuid()], clear_device=False)[0]
+            target_service = create_service(target_device, clear_service=False, speed=1.0)[0]
+            seed_bruteforce_services(services, target_device, target_service)
+            attacks = list(zip(devices, services))
+            pending = []
+
+            def attack(client: Client):
+                device_uuid, service_uuid = pending.pop()
+                client.ms(
+                    "service",
+                    ["bruteforce", "attack"],
+                    device_uuid=device_uuid,
+                    service_uuid=service_uuid,
+                    target_device=target_device,
+                    target_service=target_service,
+                )
+
+            def status(client: Client):
+                device_uuid, service_uuid = random.choice(attacks)
+                client.ms("service", ["bruteforce", "status"], device_uuid=device_uuid, service_uuid=service_uuid)
+
+            def stop(client: Client):
+                device_uuid, service_uuid = pending.pop()
+                client.ms("service", ["bruteforce", "stop"], device_uuid=device_uuid, service_uuid=service_uuid)
+
+            # the clients share the polling of all attackers, so together they send one status per attacker per interval
+            status_interval = STATUS_POLL_INTERVAL * len(self.clients) / attackers
+            for phase, task, operations, interval in [
+                ("attack", attack, len(attacks), 0.0),
+                ("status", status, len(attacks) * STATUS_POLLS, status_interval),
+                ("stop", stop, len(attacks), 0.0),
+            ]:
+                pending[:] = attacks
+                result = run_load(self.clients, task, operations, interval)
+                rows.append([attackers, phase] + self.load_row(result))
+                self.report_errors(f"{phase} errors with {attackers} attackers", result)
+
+        self.report("attackers on one target service", ["attackers", "phase"] + LOAD_COLUMNS, rows)
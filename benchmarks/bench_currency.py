@@ -0,0 +1,62 @@
+import random
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LOAD_COLUMNS, client_counts, login_clients, run_load, scaled
+from database import global_status, query
+from environment import BENCHMARK_CLIENTS
+from tests.test_currency import clear_transactions
+from tests.test_server import setup_account, super_password, super_uuid
+from tests.test_shop import create_wallet
+
+LOCK_COUNTERS = ["Innodb_row_lock_waits", "Innodb_row_lock_time", "Innodb_deadlocks"]
+
+
+def total_coins() -> int:
+    return int(query("SELECT COALESCE(SUM(amount), 0) FROM currency_wallet")[0][0])
+
+
+class BenchCurrency(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchCurrency"):
+        for client in cls.clients:
+            client.close()
+
+    def test_concurrent_transfers(self):
+        wallet_count = max(2, scaled([100])[0])
+        wallet_uuids, wallet_keys = create_wallet(amount=1000, n=wallet_count, owner=[super_uuid] * wallet_count)
+        wallets = list(zip(wallet_uuids, wallet_keys))
+        clear_transactions()
+
+        def transfer(client: Client):
+            (source_uuid, key), (destination_uuid, _) = random.sample(wallets, 2)
+            client.ms(
+                "currency",
+                ["send"],
+                source_uuid=source_uuid,
+                key=key,
+                send_amount=random.randint(1, 50),
+                destination_uuid=destination_uuid,
+                usage="benchmark",
+            )
+
+        coins = total_coins()
+        rows = []
+        lock_rows = []
+        for clients in client_counts():
+            counters = global_status(*LOCK_COUNTERS)
+            result = run_load(self.clients[:clients], transfer, scaled([5000])[0])
+            counters = {name: value - counters[name] for name, value in global_status(*LOCK_COUNTERS).items()}
+
+            rows.append(self.load_row(result))
+            lock_rows.append([clients] + [counters[name] for name in LOCK_COUNTERS])
+            self.report_errors(f"transfer errors with {clients} clients", result)
+
+        self.report(f"concurrent transfers between {wallet_count} wallets", LOAD_COLUMNS, rows)
+        self.report("innodb lock activity", ["clients"] + LOCK_COUNTERS, lock_rows)
+        self.assertEqual(coins, total_coins())
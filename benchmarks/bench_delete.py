@@ -0,0 +1,104 @@
+import time
+from typing import Callable, List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, scaled
+from benchmarks.bench_network import seed_invitations, seed_members
+from database import query
+from tests.test_currency import create_transactions
+from tests.test_device import setup_device
+from tests.test_files import create_files
+from tests.test_network import clear_networks, create_network
+from tests.test_server import setup_account, super_password
+from tests.test_service import create_service
+from tests.test_shop import create_wallet
+from util import get_client, uuid
+
+DEPENDENT_ROWS = [0, 10, 100, 1000, 10000, 50000]
+
+
+def count_rows(table, column, value) -> int:
+    return query(f"SELECT COUNT(*) FROM {table} WHERE {column}=%s", value)[0][0]
+
+
+class BenchDelete(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.client: Client = get_client()
+        cls.client.login("super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchDelete"):
+        cls.client.close()
+
+    def bench_delete(self, size: int, delete: Callable, dependents: List[Callable[[], int]]) -> list:
+        before = sum(count() for count in dependents)
+        start = time.perf_counter()
+        delete()
+        duration = time.perf_counter() - start
+        removed = before - sum(count() for count in dependents) + 1
+        return [size, removed, duration * 1000, removed / duration]
+
+    def test_device_delete(self):
+        rows = []
+        for size in [0] + scaled(DEPENDENT_ROWS[1:]):
+            clear_networks()
+            device_uuid = setup_device()[0]
+            create_files([device_uuid], n=size)
+            create_service(device_uuid, n=size)
+            seed_members([device_uuid] * size, [uuid() for _ in range(size)])
+
+            rows.append(
+                self.bench_delete(
+                    size,
+                    lambda: self.client.ms("device", ["device", "delete"], device_uuid=device_uuid),
+                    [
+                        lambda: count_rows("device_file", "device", device_uuid),
+                        lambda: count_rows("service_service", "device", device_uuid),
+                        lambda: count_rows("network_member", "device", device_uuid),
+                    ],
+                )
+            )
+
+        self.report("device/device/delete", ["dependents", "removed", "ms", "rows/s"], rows)
+
+    def test_network_delete(self):
+        rows = []
+        for size in [0] + scaled(DEPENDENT_ROWS[1:]):
+            network_uuid = create_network(setup_device()[0])[0]
+            seed_members([uuid() for _ in range(size)], [network_uuid] * size)
+            seed_invitations([uuid() for _ in range(size)], [network_uuid] * size)
+
+            rows.append(
+                self.bench_delete(
+                    size,
+                    lambda: self.client.ms("network", ["delete"], uuid=network_uuid),
+                    [
+                        lambda: count_rows("network_member", "network", network_uuid),
+                        lambda: count_rows("network_invitation", "network", network_uuid),
+                    ],
+                )
+            )
+
+        self.report("network/delete", ["dependents", "removed", "ms", "rows/s"], rows)
+
+    def test_wallet_delete(self):
+        rows = []
+        for size in [0] + scaled(DEPENDENT_ROWS[1:]):
+            wallet_uuid, wallet_key = create_wallet()
+            create_transactions(wallet_uuid, n=size)
+
+            rows.append(
+                self.bench_delete(
+                    size,
+                    lambda: self.client.ms("currency", ["delete"], source_uuid=wallet_uuid, key=wallet_key),
+                    [
+                        lambda: count_rows("currency_transaction", "source_uuid", wallet_uuid),
+                        lambda: count_rows("currency_transaction", "destination_uuid", wallet_uuid),
+                    ],
+                )
+            )
+
+        self.report("currency/delete", ["dependents", "removed", "ms", "rows/s"], rows)
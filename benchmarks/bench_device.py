@@ -0,0 +1,101 @@
+import random
+from typing import Dict, List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LATENCY_COLUMNS, LOAD_COLUMNS, login_clients, partition, run_load, scaled
+from database import execute, execute_many, query
+from environment import BENCHMARK_CLIENTS
+from tests.test_device import clear_devices
+from tests.test_server import setup_account, super_password, super_uuid
+from tests.test_service import clear_services, create_service
+from util import get_client, uuid
+
+
+def seed_devices(n, owners=None, powered_on=True, clear_device=True) -> List[str]:
+    if owners is None:
+        owners = [super_uuid]
+    if clear_device:
+        clear_devices()
+    device_uuids = [uuid() for _ in range(n)]
+    execute_many(
+        "INSERT INTO device_device (uuid, name, owner, powered_on, starter_device) VALUES (%s, %s, %s, %s, %s)",
+        [
+            (device_uuid, f"bench{i + 1}", owners[i % len(owners)], powered_on, False)
+            for i, device_uuid in enumerate(device_uuids)
+        ],
+    )
+    return device_uuids
+
+
+class BenchDevice(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.client: Client = get_client()
+        cls.client.login("super", super_password)
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchDevice"):
+        cls.client.close()
+        for client in cls.clients:
+            client.close()
+
+    def test_device_table_scaling(self):
+        own_devices = seed_devices(10)
+        foreign_devices = []
+        owners = [uuid() for _ in range(1000)]
+
+        sizes = scaled([1000, 10000, 100000, 1000000])
+        rows = []
+        means: Dict[str, List[float]] = {"spot": [], "all": [], "info": [], "ping": []}
+        for size in sizes:
+            # the table only grows, so each size adds the missing foreign devices on top of the previous ones
+            missing = max(1, size - len(own_devices) - len(foreign_devices))
+            foreign_devices += seed_devices(missing, owners, clear_device=False)
+
+            latencies = {
+                "spot": self.measure(lambda: self.client.ms("device", ["device", "spot"])),
+                "all": self.measure(lambda: self.client.ms("device", ["device", "all"])),
+                "info": self.measure(
+                    lambda: self.client.ms("device", ["device", "info"], device_uuid=random.choice(own_devices))
+                ),
+                "ping": self.measure(
+                    lambda: self.client.ms("device", ["device", "ping"], device_uuid=random.choice(foreign_devices))
+                ),
+            }
+            for endpoint, values in latencies.items():
+                rows.append([size, endpoint] + self.latency_row(values))
+                means[endpoint].append(sum(values) / len(values))
+
+        self.report("devices in device table", ["devices", "endpoint"] + LATENCY_COLUMNS, rows)
+        self.report_growth("latency growth with device table size", sizes, means)
+
+    def test_power_toggle_churn(self):
+        rows = []
+        for services in [0] + scaled([10, 100, 500]):
+            devices = seed_devices(len(self.clients) * 2)
+            clear_services()
+            for device_uuid in devices:
+                create_service(device_uuid, n=services, clear_service=False)
+            execute("UPDATE service_service SET running=TRUE")
+            devices_by_client = partition(devices, self.clients)
+
+            def toggle(client: Client):
+                device_uuid = random.choice(devices_by_client[client])
+                client.ms("device", ["device", "power"], device_uuid=device_uuid)
+
+            result = run_load(self.clients, toggle, scaled([1000])[0])
+            rows.append([services] + self.load_row(result))
+            self.report_errors(f"power errors with {services} services per device", result)
+
+            for (device_uuid,) in query("SELECT uuid FROM device_device WHERE powered_on=TRUE"):
+                self.client.ms("device", ["device", "power"], device_uuid=device_uuid)
+            running = query(
+                "SELECT COUNT(*) FROM service_service s JOIN device_device d ON s.device=d.uuid "
+                "WHERE d.powered_on=FALSE AND s.running=TRUE"
+            )[0][0]
+            self.assertEqual(0, running)
+
+        self.report("device power toggles", ["services"] + LOAD_COLUMNS, rows)
@@ -0,0 +1,131 @@
+import random
+import time
+from typing import Dict, List, Tuple
+
+from PyCrypCli.client import Client
+from PyCrypCli.exceptions import MicroserviceException
+
+from benchmark import BenchmarkCase, LATENCY_COLUMNS, LOAD_COLUMNS, login_clients, record, run_load, scaled
+from database import execute, execute_many
+from environment import BENCHMARK_CLIENTS
+from histogram import Histogram
+from tests.test_device import add_inventory_element, clear_devices, clear_inventory
+from tests.test_hardware import ELEMENT_TYPES, setup_workload
+from tests.test_server import setup_account, super_password
+from util import get_client, uuid
+
+SINGLE_PARTS = ["mainboard", "powerPack", "case"]
+
+
+def generate_build_configs(hardware: dict, n) -> List[Tuple[str, dict]]:
+    start_pc = hardware["start_pc"]
+    configs = []
+    for _ in range(n):
+        config = dict(start_pc)
+        kind = random.choice(["starter", "variant", "unknown part", "missing part"])
+        part = random.choice(ELEMENT_TYPES)
+        if kind == "variant":
+            name = random.choice(list(hardware[part]))
+            config[part] = name if part in SINGLE_PARTS else [name]
+        elif kind == "unknown part":
+            config[part] = "notfound42" if part in SINGLE_PARTS else ["notfound42"]
+        elif kind == "missing part":
+            config[random.choice(["cpu", "ram", "disk"])] = []
+        configs.append((kind, config))
+    return configs
+
+
+def seed_workloads(device_uuids: List[str]):
+    execute("TRUNCATE device_workload")
+    execute_many(
+        "INSERT INTO device_workload "
+        "(uuid, performance_cpu, performance_gpu, performance_ram, performance_disk, performance_network, "
+        "usage_cpu, usage_gpu, usage_ram, usage_disk, usage_network) VALUES "
+        "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        [(device_uuid, 10, 20, 40, 80, 160, 1, 4, 16, 64, 256) for device_uuid in device_uuids],
+    )
+
+
+def seed_service_reqs(device_uuid, n) -> List[str]:
+    execute("TRUNCATE device_service_req")
+    service_uuids = [uuid() for _ in range(n)]
+    execute_many(
+        "INSERT INTO device_service_req "
+        "(service_uuid, device_uuid, allocated_cpu, allocated_ram, allocated_gpu, allocated_disk, allocated_network) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [(service_uuid, device_uuid, 1, 4, 2, 8, 16) for service_uuid in service_uuids],
+    )
+    return service_uuids
+
+
+class BenchHardware(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.client: Client = get_client()
+        cls.client.login("super", super_password)
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchHardware"):
+        cls.client.close()
+        for client in cls.clients:
+            client.close()
+
+    def bench_resources_and_process(self, device_uuid, service_uuids) -> List[list]:
+        resources = self.measure(lambda: self.client.ms("device", ["hardware", "resources"], device_uuid=device_uuid))
+        process = self.measure(
+            lambda: self.client.ms("device", ["hardware", "process"], service_uuid=random.choice(service_uuids))
+        )
+        return [["resources"] + self.latency_row(resources), ["process"] + self.latency_row(process)]
+
+    def test_service_req_scaling(self):
+        device_uuid = setup_workload()
+
+        rows = []
+        for size in scaled([1, 10, 100, 1000, 10000]):
+            service_uuids = seed_service_reqs(device_uuid, size)
+            rows += [[size] + row for row in self.bench_resources_and_process(device_uuid, service_uuids)]
+
+        self.report("service requirements on one device", ["reqs", "endpoint"] + LATENCY_COLUMNS, rows)
+
+    def test_workload_scaling(self):
+        rows = []
+        for size in scaled([10, 100, 1000, 5000]):
+            device_uuids = [uuid() for _ in range(size)]
+            seed_workloads(device_uuids)
+            device_uuid = random.choice(device_uuids)
+            service_uuids = seed_service_reqs(device_uuid, 10)
+            rows += [[size] + row for row in self.bench_resources_and_process(device_uuid, service_uuids)]
+
+        self.report("devices in workload table", ["devices", "endpoint"] + LATENCY_COLUMNS, rows)
+
+    def test_build_validation(self):
+        clear_devices()
+        clear_inventory()
+        hardware = self.clients[0].get_hardware_config()
+        for name in hardware["start_pc"].values():
+            if name:
+                add_inventory_element(name[0] if isinstance(name, list) else name)
+        configs = generate_build_configs(hardware, scaled([500])[0])
+        outcomes: Dict[Tuple[str, str], Histogram] = {}
+
+        def build(client: Client):
+            kind, config = random.choice(configs)
+            start = time.perf_counter()
+            try:
+                client.ms("device", ["hardware", "build"], **config)
+                outcome = "success"
+            except MicroserviceException as e:
+                outcome = type(e).__name__
+            record(outcomes, (kind, outcome), time.perf_counter() - start)
+
+        result = run_load(self.clients, build, scaled([5000])[0])
+
+        self.report("hardware builds", LOAD_COLUMNS, [self.load_row(result)])
+        self.report_errors("unexpected build errors", result)
+        self.report(
+            "build latency by outcome",
+            ["generated", "outcome"] + LATENCY_COLUMNS,
+            [[kind, outcome] + self.latency_row(latencies) for (kind, outcome), latencies in sorted(outcomes.items())],
+        )
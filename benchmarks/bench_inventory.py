@@ -0,0 +1,67 @@
+import random
+from typing import Dict, List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LOAD_COLUMNS, run_load, scaled
+from database import execute, execute_many, query
+from environment import BENCHMARK_CLIENTS
+from tests.test_device import clear_inventory
+from tests.test_inventory import create_random_user
+from tests.test_server import setup_account, super_password
+from util import get_client, uuid
+
+
+def create_named_users(n) -> List[str]:
+    users = []
+    for i in range(n):
+        users.append(create_random_user())
+        execute("UPDATE user SET name=%s WHERE uuid=%s", f"bench{i + 1}", users[-1])
+    return users
+
+
+def seed_inventory(owners: List[str], name="CPU Cooler Plus") -> List[str]:
+    clear_inventory()
+    rows = [(uuid(), name, "", owner) for owner in owners]
+    execute_many(
+        "INSERT INTO inventory_inventory (element_uuid, element_name, related_ms, owner) VALUES (%s, %s, %s, %s)", rows
+    )
+    return [row[0] for row in rows]
+
+
+class BenchInventory(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.users = create_named_users(max(2, BENCHMARK_CLIENTS))
+        cls.clients: Dict[Client, str] = {}
+        for i, user in enumerate(cls.users):
+            client: Client = get_client()
+            client.login(f"bench{i + 1}", super_password)
+            cls.clients[client] = user
+
+    @classmethod
+    def tearDownClass(cls: "BenchInventory"):
+        for client in cls.clients:
+            client.close()
+
+    def test_trade_contention(self):
+        rows = []
+        for elements in sorted(scaled([256, 64, 16, 4, 1]), reverse=True):
+            element_uuids = seed_inventory([self.users[i % len(self.users)] for i in range(elements)])
+
+            def trade(client: Client):
+                target = random.choice([user for user in self.users if user != self.clients[client]])
+                client.ms("inventory", ["inventory", "trade"], element_uuid=random.choice(element_uuids), target=target)
+
+            result = run_load(list(self.clients), trade, scaled([2000])[0])
+            rows.append([elements] + self.load_row(result))
+            self.report_errors(f"trade errors with {elements} contended elements", result)
+
+            owners = query("SELECT element_uuid, COUNT(*), MIN(owner) FROM inventory_inventory GROUP BY element_uuid")
+            self.assertEqual(sorted(element_uuids), sorted(element_uuid for element_uuid, _, _ in owners))
+            for _, count, owner in owners:
+                self.assertEqual(1, count)
+                self.assertIn(owner, self.users)
+
+        self.report("inventory trades under contention", ["elements"] + LOAD_COLUMNS, rows)
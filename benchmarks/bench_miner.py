@@ -0,0 +1,61 @@
+import random
+import time
+from typing import List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LATENCY_COLUMNS, scaled
+from benchmarks.bench_device import seed_devices
+from benchmarks.bench_hardware import seed_workloads
+from benchmarks.bench_service import seed_services
+from database import execute, execute_many
+from tests.test_server import setup_account, super_password
+from tests.test_shop import create_wallet
+from util import get_client
+
+
+def seed_miners(service_uuids: List[str], wallet_uuid):
+    execute("TRUNCATE service_miner")
+    # every miner has been mining for an hour, so each one adds to the payout computed for the wallet
+    started = int((time.time() - 3600) * 1000)
+    execute_many(
+        "INSERT INTO service_miner (uuid, wallet, started, power) VALUES (%s,%s,%s,%s)",
+        [(service_uuid, wallet_uuid, started, 1.0) for service_uuid in service_uuids],
+    )
+
+
+class BenchMiner(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.client: Client = get_client()
+        cls.client.login("super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchMiner"):
+        cls.client.close()
+
+    def test_wallet_fan_in(self):
+        rows = []
+        for size in scaled([1, 10, 100, 1000, 5000]):
+            wallet_uuid, wallet_key = create_wallet()
+            device_uuids = seed_devices(size)
+            seed_workloads(device_uuids)
+            service_uuids = seed_services(device_uuids, "miner", running=True, speed=1.0)
+            seed_miners(service_uuids, wallet_uuid)
+
+            miner_list = self.measure(lambda: self.client.ms("service", ["miner", "list"], wallet_uuid=wallet_uuid))
+            miner_power = self.measure(
+                lambda: self.client.ms(
+                    "service", ["miner", "power"], service_uuid=random.choice(service_uuids), power=random.random()
+                )
+            )
+            currency_get = self.measure(
+                lambda: self.client.ms("currency", ["get"], source_uuid=wallet_uuid, key=wallet_key)
+            )
+
+            rows.append([size, "miner/list"] + self.latency_row(miner_list))
+            rows.append([size, "miner/power"] + self.latency_row(miner_power))
+            rows.append([size, "currency/get"] + self.latency_row(currency_get))
+
+        self.report("miners per wallet", ["miners", "endpoint"] + LATENCY_COLUMNS, rows)
@@ -0,0 +1,144 @@
+import random
+from typing import Dict, List
+
+from PyCrypCli.client import Client
+
+from benchmark import (
+    BenchmarkCase,
+    LATENCY_COLUMNS,
+    LOAD_COLUMNS,
+    Sampler,
+    login_clients,
+    partition,
+    run_load,
+    scaled,
+    timed,
+)
+from benchmarks.bench_device import seed_devices
+from database import execute_many, query
+from environment import BENCHMARK_CLIENTS, BENCHMARK_REPEAT
+from histogram import Histogram
+from tests.test_device import setup_device
+from tests.test_network import create_invitation, create_network
+from tests.test_server import setup_account, super_password
+from util import get_client, uuid
+
+
+def seed_members(device_uuids: List[str], network_uuids: List[str]):
+    execute_many(
+        "INSERT INTO network_member (uuid, device, network) VALUES (%s,%s,%s)",
+        [(uuid(), device, network) for device, network in zip(device_uuids, network_uuids)],
+    )
+
+
+def seed_invitations(device_uuids: List[str], network_uuids: List[str], request=False) -> List[str]:
+    invitation_uuids = [uuid() for _ in device_uuids]
+    execute_many(
+        "INSERT INTO network_invitation (uuid, device, network, request) VALUES (%s,%s,%s,%s)",
+        [
+            (invitation_uuid, device, network, request)
+            for invitation_uuid, device, network in zip(invitation_uuids, device_uuids, network_uuids)
+        ],
+    )
+    return invitation_uuids
+
+
+class BenchNetwork(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.client: Client = get_client()
+        cls.client.login("super", super_password)
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchNetwork"):
+        cls.client.close()
+        for client in cls.clients:
+            client.close()
+
+    def test_invitation_table_scaling(self):
+        device_uuid = setup_device()[0]
+        network_uuid = create_network(device_uuid)[0]
+        networks = [uuid() for _ in range(1000)]
+        devices = [uuid() for _ in range(10000)]
+        seed_invitations([device_uuid] * 10, random.choices(networks, k=10))
+        seed_invitations(random.choices(devices, k=10), [network_uuid] * 10)
+        seed_invitations(random.choices(devices, k=10), [network_uuid] * 10, request=True)
+        seeded = 30
+
+        rows = []
+        for size in scaled([100, 1000, 10000, 100000]):
+            # background invitations and join requests between unrelated devices and networks, half of each kind
+            missing = max(0, size - seeded)
+            seed_invitations(random.choices(devices, k=missing // 2), random.choices(networks, k=missing // 2))
+            seed_invitations(
+                random.choices(devices, k=missing - missing // 2),
+                random.choices(networks, k=missing - missing // 2),
+                request=True,
+            )
+            seeded += missing
+
+            latencies = {
+                "invitations": self.measure(lambda: self.client.ms("network", ["invitations"], device=device_uuid)),
+                "invitations/network": self.measure(
+                    lambda: self.client.ms("network", ["invitations", "network"], uuid=network_uuid)
+                ),
+                "requests": self.measure(lambda: self.client.ms("network", ["requests"], uuid=network_uuid)),
+            }
+
+            # single-row actions, each on a fresh invitation inside the large table
+            pending = {
+                "accept": [create_invitation(device_uuid, uuid()) for _ in range(BENCHMARK_REPEAT)],
+                "deny": [create_invitation(device_uuid, uuid()) for _ in range(BENCHMARK_REPEAT)],
+                "revoke": [create_invitation(uuid(), network_uuid) for _ in range(BENCHMARK_REPEAT)],
+            }
+            for action, invitation_uuids in pending.items():
+                latencies[action] = self.measure(
+                    lambda: self.client.ms("network", [action], uuid=invitation_uuids.pop()), len(invitation_uuids)
+                )
+
+            for endpoint, values in latencies.items():
+                rows.append([seeded, endpoint] + self.latency_row(values))
+
+        self.report("rows in network_invitation", ["invitations", "endpoint"] + LATENCY_COLUMNS, rows)
+
+    def test_membership_churn(self):
+        owner = seed_devices(1)[0]
+        devices = seed_devices(scaled([2000])[0], clear_device=False)
+        # create_network hides every second network, only the public ones accept join requests
+        networks = create_network(owner, n=5)[::2]
+        # large networks, so the churn runs against member lists of realistic size
+        members = scaled([5000])[0]
+        for network_uuid in networks:
+            seed_members([uuid() for _ in range(members)], [network_uuid] * members)
+        devices_by_client = partition(devices, self.clients)
+        steps: Dict[str, Histogram] = {}
+
+        def cycle(client: Client):
+            device_uuid = random.choice(devices_by_client[client])
+            network_uuid = random.choice(networks)
+            request = timed(steps, "request", client.ms, "network", ["request"], uuid=network_uuid, device=device_uuid)
+            timed(steps, "accept", client.ms, "network", ["accept"], uuid=request["uuid"])
+            if random.random() < 0.5:
+                timed(steps, "leave", client.ms, "network", ["leave"], uuid=network_uuid, device=device_uuid)
+            else:
+                timed(steps, "kick", client.ms, "network", ["kick"], uuid=network_uuid, device=device_uuid)
+
+        sampler = Sampler(lambda: dict(query("SELECT network, COUNT(*) FROM network_member GROUP BY network")))
+        sampler.start()
+        result = run_load(self.clients, cycle, scaled([5000])[0])
+        sampler.stop()
+
+        self.report("request/accept/leave or kick cycles", LOAD_COLUMNS, [self.load_row(result)])
+        self.report_errors("membership errors", result)
+        self.report(
+            f"membership operations ({sum(map(len, steps.values())) / result.duration:.2f} ops/s)",
+            ["step"] + LATENCY_COLUMNS,
+            [[step] + self.latency_row(latencies) for step, latencies in steps.items()],
+        )
+        self.report(
+            "members over time",
+            ["t s"] + [f"network {i + 1}" for i in range(len(networks))],
+            [[t] + [members.get(network_uuid, 0) for network_uuid in networks] for t, members in sampler.samples],
+        )
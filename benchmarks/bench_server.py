@@ -0,0 +1,69 @@
+import random
+from typing import Dict, List
+
+from PyCrypCli.client import Client
+from PyCrypCli.exceptions import InvalidServerResponseException
+
+from benchmark import BenchmarkCase, LOAD_COLUMNS, run_load, scaled
+from benchmarks.bench_inventory import create_named_users
+from database import execute, query
+from environment import BENCHMARK_CLIENTS
+from tests.test_server import setup_account, super_password
+from util import get_client
+
+# values of 2048 characters are rejected with "unsupported parameter size"
+SETTING_VALUE_LIMIT = 2047
+
+
+def setting(client: Client, **data) -> dict:
+    response = client.request({"action": "setting", **data})
+    if "error" in response:
+        raise InvalidServerResponseException(response)
+    return response
+
+
+class BenchServer(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        create_named_users(BENCHMARK_CLIENTS)
+        cls.clients: List[Client] = []
+        for i in range(BENCHMARK_CLIENTS):
+            cls.clients.append(get_client())
+            cls.clients[-1].login(f"bench{i + 1}", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchServer"):
+        for client in cls.clients:
+            client.close()
+
+    def test_settings_storage(self):
+        execute("TRUNCATE user_settings")
+        keys: Dict[Client, List[str]] = {client: [] for client in self.clients}
+        keys_per_round = scaled([500])[0]
+
+        def write(client: Client):
+            keys[client].append(key := f"bench.setting.{len(keys[client])}")
+            setting(client, key=key, value="x" * random.randint(1, SETTING_VALUE_LIMIT))
+
+        def read(client: Client):
+            setting(client, key=random.choice(keys[client]))
+
+        def delete(client: Client):
+            setting(client, key=keys[client].pop(), delete="")
+
+        rows = []
+        # every client works on its own keys, so each one gets the same share of operations
+        for _ in range(4):
+            for action, task in [("write", write), ("read", read)]:
+                result = run_load(self.clients, task, keys_per_round, per_client=True)
+                settings = query("SELECT COUNT(*) FROM user_settings")[0][0]
+                rows.append([settings, action] + self.load_row(result))
+                self.report_errors(f"setting {action} errors with {settings} stored settings", result)
+        result = run_load(self.clients, delete, keys_per_round * 4, per_client=True)
+        settings = query("SELECT COUNT(*) FROM user_settings")[0][0]
+        rows.append([settings, "delete"] + self.load_row(result))
+        self.report_errors("setting delete errors", result)
+
+        self.report("user settings", ["settings", "action"] + LOAD_COLUMNS, rows)
+        self.assertEqual(0, settings)
@@ -0,0 +1,112 @@
+import json
+import random
+from typing import Dict, List
+
+from PyCrypCli.client import Client
+
+from benchmark import (
+    BenchmarkCase,
+    LATENCY_COLUMNS,
+    LOAD_COLUMNS,
+    login_clients,
+    partition,
+    recording,
+    run_load,
+    scaled,
+    timed,
+)
+from benchmarks.bench_device import seed_devices
+from benchmarks.bench_hardware import seed_workloads
+from database import execute, execute_many, query
+from environment import BENCHMARK_CLIENTS
+from histogram import Histogram
+from tests.test_server import setup_account, super_password, super_uuid
+from tests.test_service import clear_services, create_service
+from util import uuid
+
+
+def seed_services(device_uuids: List[str], name="telnet", owner=super_uuid, running=False, speed=None) -> List[str]:
+    clear_services()
+    service_uuids = [uuid() for _ in device_uuids]
+    execute_many(
+        "INSERT INTO service_service (uuid, device, owner, name, running, running_port, part_owner, speed) "
+        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
+        [
+            (service_uuid, device_uuid, owner, name, running, 1337, None, speed)
+            for service_uuid, device_uuid in zip(service_uuids, device_uuids)
+        ],
+    )
+    return service_uuids
+
+
+def count_leaked_service_reqs() -> int:
+    return query(
+        "SELECT COUNT(*) FROM device_service_req WHERE service_uuid NOT IN (SELECT uuid FROM service_service)"
+    )[0][0]
+
+
+class BenchService(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchService"):
+        for client in cls.clients:
+            client.close()
+
+    def test_lifecycle_churn(self):
+        devices = seed_devices(len(self.clients) * 4)
+        seed_workloads(devices)
+        clear_services()
+        execute("TRUNCATE device_service_req")
+        # every client churns on its own devices, so no two clients create the same service on one device
+        devices_by_client = partition(devices, self.clients)
+        steps: Dict[str, Histogram] = {}
+
+        def cycle(client: Client):
+            device_uuid = random.choice(devices_by_client[client])
+            service = timed(steps, "create", client.ms, "service", ["create"], device_uuid=device_uuid, name="ssh")
+            data = {"device_uuid": device_uuid, "service_uuid": service["uuid"]}
+            timed(steps, "toggle", client.ms, "service", ["toggle"], **data)
+            timed(steps, "delete", client.ms, "service", ["delete"], **data)
+
+        result = run_load(self.clients, cycle, scaled([2000])[0])
+
+        self.report("create/toggle/delete cycles", LOAD_COLUMNS, [self.load_row(result)])
+        self.report_errors("cycle errors", result)
+        self.report(
+            f"service operations ({sum(map(len, steps.values())) / result.duration:.2f} ops/s)",
+            ["step"] + LATENCY_COLUMNS,
+            [[step] + self.latency_row(latencies) for step, latencies in steps.items()],
+        )
+        self.assertEqual(0, count_leaked_service_reqs())
+
+    def test_portscan_use(self):
+        rows = []
+        for services in scaled([1, 10, 100, 1000, 5000]):
+            attackers = seed_devices(len(self.clients) * 4)
+            targets = seed_devices(4, clear_device=False)
+            portscans = dict(zip(attackers, seed_services(attackers, "portscan")))
+            for target in targets:
+                create_service(target, n=services, clear_service=False)
+            response_sizes = Histogram(decimals=0)
+
+            def scan(client: Client):
+                device_uuid = random.choice(attackers)
+                response = client.ms(
+                    "service",
+                    ["use"],
+                    device_uuid=device_uuid,
+                    service_uuid=portscans[device_uuid],
+                    target_device=random.choice(targets),
+                )
+                with recording:
+                    response_sizes.record(len(json.dumps(response).encode()))
+
+            result = run_load(self.clients, scan, scaled([1000])[0])
+            rows.append([services, response_sizes.summary()["max"]] + self.load_row(result))
+            self.report_errors(f"portscan errors with {services} services per target", result)
+
+        self.report("portscans of heavily built devices", ["services", "bytes"] + LOAD_COLUMNS, rows)
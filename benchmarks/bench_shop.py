@@ -0,0 +1,74 @@
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from PyCrypCli.client import Client
+
+from benchmark import BenchmarkCase, LOAD_COLUMNS, login_clients, run_load, scaled
+from environment import BENCHMARK_CLIENTS
+from tests.test_server import setup_account, super_password
+from timing import summarize
+
+
+def product_names(categories: dict) -> List[str]:
+    names = []
+    for category in categories.values():
+        names += list(category["items"])
+        names += product_names(category["categories"])
+    return names
+
+
+class BenchShop(BenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        setup_account()
+        cls.clients = login_clients(BENCHMARK_CLIENTS, "super", super_password)
+
+    @classmethod
+    def tearDownClass(cls: "BenchShop"):
+        for client in cls.clients:
+            client.close()
+
+    def test_catalog_reads(self):
+        # first request of this module, only cold if the module runs alone against a freshly started server
+        start = time.perf_counter()
+        catalog = self.clients[0].ms("inventory", ["shop", "list"])
+        first_calls = {"shop/list": time.perf_counter() - start}
+        products = product_names(catalog["categories"])
+
+        endpoints: Dict[str, Callable[[Client], dict]] = {
+            "shop/list": lambda client: client.ms("inventory", ["shop", "list"]),
+            "shop/info": lambda client: client.ms("inventory", ["shop", "info"], product=random.choice(products)),
+            "hardware/list": lambda client: client.get_hardware_config(),
+        }
+        for endpoint in ["shop/info", "hardware/list"]:
+            first_calls[endpoint] = self.measure(lambda: endpoints[endpoint](self.clients[0]), 1)[0]
+
+        load_rows = []
+        cache_rows = []
+        for endpoint, request in endpoints.items():
+            # every other client sends its first request for this endpoint now, on an otherwise idle server
+            cold = [self.measure(lambda: request(client), 1)[0] for client in self.clients[1:]]
+            size = len(json.dumps(request(self.clients[0])).encode())
+            result = run_load(self.clients, request, scaled([2000])[0])
+            warm = summarize(result.latencies)["mean"]
+
+            load_rows.append([endpoint, size, size * result.throughput / 1024] + self.load_row(result))
+            cache_rows.append(
+                [
+                    endpoint,
+                    first_calls[endpoint] * 1000,
+                    summarize(cold)["mean"] * 1000,
+                    warm * 1000,
+                    first_calls[endpoint] / warm if warm else 0.0,
+                ]
+            )
+            self.report_errors(f"{endpoint} errors", result)
+
+        self.report("static catalog reads", ["endpoint", "bytes", "KiB/s"] + LOAD_COLUMNS, load_rows)
+        self.report(
+            "cold vs warm latency",
+            ["endpoint", "first in module ms", "first per client ms", "warm mean ms", "first/warm"],
+            cache_rows,
+        )
@@ -1,19 +1,113 @@
+import atexit
+import heapq
+import re
+import reprlib
+import sys
+import time
+from functools import wraps
+from typing import Dict, List, Tuple
+
 from pymysql import connect, Connection
 
-from environment import DB_HOST, DB_PORT, DB_USERNAME, DB_PASSWORD, DB_DATABASE
+from environment import DB_HOST, DB_PORT, DB_USERNAME, DB_PASSWORD, DB_DATABASE, DB_PROFILE, DB_PROFILE_TOP, TRACE_FILE
+from timing import format_table
+from tracing import tracer
+
+
+def connect_database(**kwargs) -> Connection:
+    return connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USERNAME, password=DB_PASSWORD, db=DB_DATABASE, charset="utf8mb4", **kwargs
+    )
+
+
+db: Connection = connect_database()
+
+
+class QueryProfile:
+    def __init__(self, top: int):
+        self.top: int = top
+        self.templates: Dict[str, Tuple[int, float, float]] = {}
+        self.helpers: Dict[str, Tuple[int, float, float]] = {}
+        self.slowest: List[Tuple[float, str, str]] = []
+
+    def record(self, sql: str, helper: str, args: tuple, duration: float):
+        template = re.sub(r"\s+", " ", sql).strip()
+        for key, stats in [(template, self.templates), (helper, self.helpers)]:
+            count, total, slowest = stats.get(key, (0, 0.0, 0.0))
+            stats[key] = (count + 1, total + duration, max(slowest, duration))
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, (duration, helper, f"{template} {reprlib.repr(args)}"))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, helper, f"{template} {reprlib.repr(args)}"))
+
+    def table(self, column: str, stats: dict) -> str:
+        rows = []
+        by_total = sorted(stats.items(), key=lambda item: item[1][1], reverse=True)
+        for key, (count, total, slowest) in by_total[: self.top]:
+            rows.append([key[:100], count, total * 1000, total / count * 1000, slowest * 1000])
+        return format_table([column, "count", "total ms", "mean ms", "max ms"], rows)
+
+    def report(self) -> str:
+        slowest = format_table(
+            ["ms", "helper", "statement"],
+            [[duration * 1000, helper, statement[:160]] for duration, helper, statement in sorted(self.slowest)[::-1]],
+        )
+        return "\n\n".join([self.table("helper", self.helpers), self.table("sql", self.templates), slowest])
+
+
+profile = QueryProfile(DB_PROFILE_TOP)
 
-db: Connection = connect(
-    host=DB_HOST, port=DB_PORT, user=DB_USERNAME, password=DB_PASSWORD, db=DB_DATABASE, charset="utf8mb4"
-)
 
+def profiled(func):
+    @wraps(func)
+    def wrapper(sql, *args):
+        if not DB_PROFILE and not TRACE_FILE:
+            return func(sql, *args)
+        start = time.perf_counter()
+        try:
+            return func(sql, *args)
+        finally:
+            end = time.perf_counter()
+            # attribute the statement to the fixture helper (setup_device, create_files, ...) that issued it
+            helper = sys._getframe(1).f_code.co_name
+            if DB_PROFILE:
+                profile.record(sql, helper, args, end - start)
+            if TRACE_FILE:
+                tracer.add(func.__name__, "database", start, end, helper=helper, sql=re.sub(r"\s+", " ", sql).strip())
 
+    return wrapper
+
+
+@profiled
 def query(sql, *args) -> dict:
     with db.cursor() as cursor:
         cursor.execute(sql, args)
-        return cursor.fetchall()
+        result = cursor.fetchall()
+    # end the read snapshot so the next query sees rows changed by the microservices in the meantime
+    db.commit()
+    return result
 
 
+@profiled
 def execute(sql, *args):
     with db.cursor() as cursor:
         cursor.execute(sql, args)
     db.commit()
+
+
+@profiled
+def execute_many(sql, rows):
+    with db.cursor() as cursor:
+        cursor.executemany(sql, rows)
+    db.commit()
+
+
+def global_status(*names) -> dict:
+    rows = query(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({', '.join(['%s'] * len(names))})", *names)
+    return {name: int(value) for name, value in rows}
+
+
+@atexit.register
+def print_query_profile():
+    if profile.templates:
+        print(f"\nDatabase fixture profile\n{profile.report()}", file=sys.stderr, flush=True)
@@ -5,5 +5,32 @@ DB_PORT = int(getenv("DB_PORT", "3306"))
 DB_USERNAME = getenv("DB_USERNAME", "cryptic")
 DB_PASSWORD = getenv("DB_PASSWORD", "cryptic")
 DB_DATABASE = getenv("DB_DATABASE", "cryptic")
+DB_PROFILE = getenv("DB_PROFILE", "false").lower() == "true"
+DB_PROFILE_TOP = int(getenv("DB_PROFILE_TOP", "10"))
 
 SERVER_LOCATION = getenv("SERVER_LOCATION", "ws://127.0.0.1:8080")
+
+REQUEST_TIMINGS = getenv("REQUEST_TIMINGS", "true").lower() == "true"
+HISTOGRAM_WINDOW = float(getenv("HISTOGRAM_WINDOW", "60"))
+HISTOGRAM_FILE = getenv("HISTOGRAM_FILE", "")
+SERVER_QUERY_PROFILE = getenv("SERVER_QUERY_PROFILE", "false").lower() == "true"
+EXPLAIN_QUERIES = getenv("EXPLAIN_QUERIES", "false").lower() == "true"
+WIRE_STATS = getenv("WIRE_STATS", "false").lower() == "true"
+WIRE_BASELINE = getenv("WIRE_BASELINE", "")
+WIRE_BASELINE_TOLERANCE = float(getenv("WIRE_BASELINE_TOLERANCE", "0.1"))
+TRACE_FILE = getenv("TRACE_FILE", "")
+METRICS_PORT = int(getenv("METRICS_PORT", "0"))
+METRICS_FILE = getenv("METRICS_FILE", "")
+METRICS_INTERVAL = float(getenv("METRICS_INTERVAL", "10"))
+HARNESS_PROFILE = getenv("HARNESS_PROFILE", "false").lower() == "true"
+HARNESS_PROFILE_INTERVAL = float(getenv("HARNESS_PROFILE_INTERVAL", "0.005"))
+HARNESS_PROFILE_FILE = getenv("HARNESS_PROFILE_FILE", "harness.folded")
+
+BENCHMARK_SCALE = float(getenv("BENCHMARK_SCALE", "1"))
+BENCHMARK_REPEAT = int(getenv("BENCHMARK_REPEAT", "20"))
+BENCHMARK_CLIENTS = int(getenv("BENCHMARK_CLIENTS", "16"))
+
+RESOURCE_SAMPLES = getenv("RESOURCE_SAMPLES", "false").lower() == "true"
+RESOURCE_INTERVAL = float(getenv("RESOURCE_INTERVAL", "1"))
+RESOURCE_TARGETS = getenv("RESOURCE_TARGETS", "")
+RESOURCE_FILE = getenv("RESOURCE_FILE", "resources.csv")
@@ -0,0 +1,198 @@
+import atexit
+import re
+import sys
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from pymysql import Connection, MySQLError
+
+from database import connect_database
+from environment import DB_DATABASE, EXPLAIN_QUERIES
+from timing import format_table
+
+CONSUMERS = ("events_statements_current", "events_statements_history_long")
+
+# MariaDB can explain these without executing them
+EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# (table, access type, key, estimated rows, flags) per row of the EXPLAIN output
+Plan = List[Tuple[str, str, str, int, List[str]]]
+
+
+def normalize(statement: str) -> str:
+    template = re.sub(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b", "?", statement)
+    template = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(...)", template)
+    return re.sub(r"\s+", " ", template).strip()
+
+
+def plan_flags(access: str, extra: str) -> List[str]:
+    flags = []
+    if access == "ALL":
+        flags.append("full scan")
+    elif access == "index":
+        flags.append("full index scan")
+    if "Using filesort" in extra:
+        flags.append("filesort")
+    if "Using temporary" in extra:
+        flags.append("temporary")
+    return flags
+
+
+class ExplainProfile:
+    def __init__(self):
+        self.lock: Lock = Lock()
+        self.connection: Optional[Connection] = None
+        self.source: Optional[str] = None
+        # original ENABLED values of the consumers and (general_log, log_output) to restore at exit
+        self.consumers: Dict[str, str] = {}
+        self.general_log: Optional[Tuple[int, str]] = None
+        self.endpoints: Dict[str, Set[str]] = {}
+        self.plans: Dict[str, Plan] = {}
+        self.unexplained: Set[str] = set()
+
+    def connect(self):
+        self.connection = connect_database(autocommit=True)
+        with self.connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    "SELECT NAME, ENABLED FROM performance_schema.setup_consumers WHERE NAME IN %s", (CONSUMERS,)
+                )
+                consumers = dict(cursor.fetchall())
+                if any(consumers.get(name) != "YES" for name in CONSUMERS):
+                    cursor.execute(
+                        "UPDATE performance_schema.setup_consumers SET ENABLED='YES' WHERE NAME IN %s", (CONSUMERS,)
+                    )
+                    # only remembered once changed, so restore never needs privileges connect did not have
+                    self.consumers = consumers
+                # truncating the history needs the DROP privilege on performance_schema
+                cursor.execute("TRUNCATE TABLE performance_schema.events_statements_history_long")
+                self.source = "performance_schema"
+                return
+            except MySQLError:
+                self.restore()
+            try:
+                cursor.execute("SELECT @@GLOBAL.general_log, @@GLOBAL.log_output")
+                general_log = cursor.fetchone()
+                cursor.execute("SET GLOBAL log_output='TABLE'")
+                self.general_log = general_log
+                cursor.execute("SET GLOBAL general_log=1")
+                cursor.execute("TRUNCATE TABLE mysql.general_log")
+                self.source = "general_log"
+            except MySQLError:
+                self.restore()
+                self.source = None
+
+    def restore(self):
+        # put back the server settings changed in connect, so later runs are not slowed down by the statement log
+        statements = [
+            ("UPDATE performance_schema.setup_consumers SET ENABLED=%s WHERE NAME=%s", (enabled, name))
+            for name, enabled in self.consumers.items()
+        ]
+        if self.general_log is not None:
+            statements.append(("SET GLOBAL general_log=%s", (self.general_log[0],)))
+            statements.append(("SET GLOBAL log_output=%s", (self.general_log[1],)))
+        self.consumers, self.general_log = {}, None
+        with self.connection.cursor() as cursor:
+            for sql, args in statements:
+                try:
+                    cursor.execute(sql, args)
+                except MySQLError:
+                    pass
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            if self.source == "performance_schema":
+                cursor.execute("TRUNCATE TABLE performance_schema.events_statements_history_long")
+            else:
+                cursor.execute("TRUNCATE TABLE mysql.general_log")
+
+    def statements(self) -> List[str]:
+        with self.connection.cursor() as cursor:
+            if self.source == "performance_schema":
+                cursor.execute(
+                    "SELECT SQL_TEXT FROM performance_schema.events_statements_history_long "
+                    "WHERE CURRENT_SCHEMA=%s AND THREAD_ID <> "
+                    "(SELECT THREAD_ID FROM performance_schema.threads WHERE PROCESSLIST_ID=CONNECTION_ID())",
+                    (DB_DATABASE,),
+                )
+            else:
+                cursor.execute(
+                    "SELECT argument FROM mysql.general_log WHERE command_type='Query' AND thread_id <> CONNECTION_ID()"
+                )
+            texts = [text.decode(errors="replace") if isinstance(text, bytes) else text for text, in cursor.fetchall()]
+        # skip the snapshots of the server query profile
+        return [text for text in texts if text and EXPLAINABLE.match(text) and "performance_schema" not in text]
+
+    def explain(self, statement: str) -> Optional[Plan]:
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {statement}")
+                columns = [column[0] for column in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except MySQLError:
+            # truncated statement texts and prepared statements with placeholders cannot be explained
+            return None
+        return [
+            (
+                row["table"] or "",
+                row["type"] or "",
+                row["key"] or "",
+                int(row["rows"] or 0),
+                plan_flags(row["type"] or "", row["Extra"] or ""),
+            )
+            for row in rows
+        ]
+
+    def captured(self, endpoint: str, request: Callable, *args, **kwargs) -> dict:
+        with self.lock:
+            if self.connection is None:
+                self.connect()
+            if self.source is None:
+                return request(*args, **kwargs)
+            self.clear()
+            try:
+                return request(*args, **kwargs)
+            finally:
+                self.record(endpoint, self.statements())
+
+    def record(self, endpoint: str, statements: List[str]):
+        for statement in statements:
+            template = normalize(statement)
+            self.endpoints.setdefault(template, set()).add(endpoint)
+            if template in self.plans or template in self.unexplained:
+                continue
+            # explained once against the data seeded at the time the statement was first seen
+            plan = self.explain(statement)
+            if plan is None:
+                self.unexplained.add(template)
+            else:
+                self.plans[template] = plan
+
+    def report(self) -> str:
+        rows = []
+        for template, plan in self.plans.items():
+            for table, access, key, estimate, flags in plan:
+                if flags:
+                    endpoints = ", ".join(sorted(self.endpoints[template]))
+                    rows.append([table, access, key or "-", estimate, ", ".join(flags), endpoints, template[:100]])
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return format_table(["table", "type", "key", "rows", "flags", "endpoints", "statement"], rows)
+
+
+explain_profile = ExplainProfile()
+
+
+@atexit.register
+def print_explain_profile():
+    if not EXPLAIN_QUERIES or explain_profile.connection is None:
+        return
+    explain_profile.restore()
+    if explain_profile.source is None:
+        print("\nQuery plans: no statement log available", file=sys.stderr, flush=True)
+        return
+    print(
+        f"\nQuery plans of {len(explain_profile.plans)} distinct statements from {explain_profile.source} "
+        f"({len(explain_profile.unexplained)} could not be explained)\n{explain_profile.report()}",
+        file=sys.stderr,
+        flush=True,
+    )
@@ -0,0 +1,121 @@
+import atexit
+import os
+import sys
+import time
+from collections import Counter
+from threading import Event, Thread, enumerate as threads, get_ident
+from types import FrameType
+from typing import Dict, Tuple
+
+from environment import HARNESS_PROFILE_FILE, HARNESS_PROFILE_INTERVAL
+from timing import format_table
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+SOCKET_MODULES = [os.path.join("websocket", "_socket.py"), "socket.py", "ssl.py", "selectors.py"]
+
+
+def thread_cpu(native_id: int) -> float:
+    # utime and stime in clock ticks, a thread that has finished in the meantime raises FileNotFoundError
+    with open(f"/proc/self/task/{native_id}/stat") as file:
+        fields = file.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class HarnessProfile(Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="harness-profile", daemon=True)
+        self.interval: float = interval
+        self.stopped: Event = Event()
+        self.started_at: float = 0.0
+        self.wall: float = 0.0
+        self.process_cpu: float = 0.0
+        # seconds per (category, stack from root to leaf)
+        self.stacks: Counter = Counter()
+        # (wall, cpu) of the previous sample per native thread id
+        self.cpu_clocks: Dict[int, Tuple[float, float]] = {}
+
+    def run(self):
+        self.started_at, cpu = time.perf_counter(), time.process_time()
+        while not self.stopped.wait(self.interval):
+            self.sample()
+        self.wall, self.process_cpu = time.perf_counter() - self.started_at, time.process_time() - cpu
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def sample(self):
+        # idents of finished threads can be reused, the kernel thread ids of live threads are stable
+        native_ids = {thread.ident: thread.native_id for thread in threads()}
+        cpu_clocks = {}
+        for thread_id, frame in sys._current_frames().items():
+            native_id = native_ids.get(thread_id)
+            if thread_id == get_ident() or native_id is None:
+                continue
+            now = time.perf_counter()
+            try:
+                cpu = thread_cpu(native_id)
+            except OSError:
+                continue
+            last_now, last_cpu = self.cpu_clocks.get(native_id, (now, cpu))
+            wall = now - last_now
+            busy = min(max(cpu - last_cpu, 0.0), wall)
+            # the clock advances in whole ticks, cpu time beyond this interval is carried over to the next sample
+            cpu_clocks[native_id] = (now, last_cpu + busy)
+
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            labels = tuple(frame_label(frame) for frame in reversed(stack))
+            in_socket = any(frame.f_code.co_filename.endswith(module) for frame in stack for module in SOCKET_MODULES)
+            self.stacks["cpu", labels] += busy
+            # the rest of the interval the thread was blocked: on the websocket, sleeping or waiting for a lock
+            self.stacks["socket wait" if in_socket else "other wait", labels] += wall - busy
+        self.cpu_clocks = cpu_clocks
+
+    def report(self, top: int = 20) -> str:
+        categories = Counter()
+        own = Counter()
+        total = Counter()
+        for (category, labels), seconds in self.stacks.items():
+            categories[category] += seconds
+            if category == "cpu" and labels:
+                own[labels[-1]] += seconds
+                for label in set(labels):
+                    total[label] += seconds
+        summary = format_table(
+            ["wall s", "process cpu s", "sampled cpu s", "socket wait s", "other wait s"],
+            [[self.wall, self.process_cpu, categories["cpu"], categories["socket wait"], categories["other wait"]]],
+        )
+        hot = format_table(
+            ["function", "self cpu s", "total cpu s"],
+            [[label, seconds, total[label]] for label, seconds in own.most_common(top)],
+        )
+        return f"{summary}\n\n{hot}"
+
+    def write_folded(self, path: str):
+        # collapsed stacks, the input format of flamegraph.pl and speedscope
+        with open(path, "w") as file:
+            for (category, labels), seconds in sorted(self.stacks.items()):
+                if (weight := round(seconds * 1e6)) > 0:
+                    file.write(f"{';'.join((category,) + labels)} {weight}\n")
+
+
+harness_profile = HarnessProfile(HARNESS_PROFILE_INTERVAL)
+
+
+@atexit.register
+def print_harness_profile():
+    if not harness_profile.is_alive():
+        return
+    harness_profile.stop()
+    print(f"\nHarness profile\n{harness_profile.report()}", file=sys.stderr, flush=True)
+    if HARNESS_PROFILE_FILE:
+        harness_profile.write_folded(HARNESS_PROFILE_FILE)
+        print(f"Wrote collapsed stacks in microseconds to {HARNESS_PROFILE_FILE}", file=sys.stderr, flush=True)
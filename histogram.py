@@ -0,0 +1,198 @@
+import base64
+import json
+import math
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+MAGIC = b"HDR1"
+HEADER = struct.Struct("<4sBBB")
+
+# latencies are recorded in microseconds up to one hour
+HIGHEST_TRACKABLE = 3600 * 10**6
+
+
+def write_varint(out: bytearray, value: int):
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varints(data: bytes) -> Iterator[int]:
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            yield value >> 1 if not value & 1 else -((value + 1) >> 1)
+            value = shift = 0
+
+
+class Histogram:
+    def __init__(
+        self, significant_figures: int = 2, highest_bits: int = HIGHEST_TRACKABLE.bit_length(), decimals: int = 6
+    ):
+        self.significant_figures: int = significant_figures
+        self.highest_bits: int = highest_bits
+        # recorded values are stored as integers of 10**-decimals, microseconds for latencies in seconds
+        self.decimals: int = decimals
+        # every power of two range is split into sub buckets fine enough for the requested precision
+        self.sub_bucket_bits: int = math.ceil(math.log2(2 * 10**significant_figures))
+        self.half: int = 1 << (self.sub_bucket_bits - 1)
+        buckets = max(highest_bits - self.sub_bucket_bits, 0) + 1
+        self.counts: array = array("q", bytes(8 * (buckets + 1) * self.half))
+        self.total: int = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def index(self, value: int) -> int:
+        bucket = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return bucket * self.half + (value >> bucket)
+
+    def value(self, index: int) -> int:
+        # highest value that is recorded at this index
+        bucket = max(index // self.half - 1, 0)
+        return ((index - bucket * self.half) << bucket) + (1 << bucket) - 1
+
+    def record(self, value: float, count: int = 1):
+        value = min(max(int(value * 10**self.decimals), 0), (1 << self.highest_bits) - 1)
+        self.counts[self.index(value)] += count
+        self.total += count
+
+    def layout(self) -> Tuple[int, int, int]:
+        return self.significant_figures, self.highest_bits, self.decimals
+
+    def merge(self, other: "Histogram"):
+        if other.layout() != self.layout():
+            raise ValueError("histograms with different precision cannot be merged")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+
+    def percentile(self, p: float) -> float:
+        if not self.total:
+            return 0.0
+        rank, seen = min(self.total - 1, int(self.total * p / 100)), 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                return self.value(index) / 10**self.decimals
+        return 0.0
+
+    def summary(self) -> dict:
+        if not self.total:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        total = highest = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                total += count * self.value(index)
+                highest = index
+        return {
+            "count": self.total,
+            "mean": total / self.total / 10**self.decimals,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.value(highest) / 10**self.decimals,
+        }
+
+    def encode(self) -> bytes:
+        # non-zero counts as positive varints, runs of empty buckets as one negative varint
+        body, zeros = bytearray(), 0
+        for count in self.counts:
+            if not count:
+                zeros += 1
+                continue
+            if zeros:
+                write_varint(body, -zeros)
+                zeros = 0
+            write_varint(body, count)
+        return HEADER.pack(MAGIC, *self.layout()) + zlib.compress(bytes(body))
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Histogram":
+        magic, *layout = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not an encoded histogram")
+        histogram = cls(*layout)
+        index, offset = 0, HEADER.size
+        for value in read_varints(zlib.decompress(data[offset:])):
+            if value < 0:
+                index -= value
+                continue
+            histogram.counts[index] = value
+            histogram.total += value
+            index += 1
+        return histogram
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.encode()).decode()
+
+    @classmethod
+    def from_base64(cls, text: str) -> "Histogram":
+        return cls.decode(base64.b64decode(text))
+
+
+class WindowedHistograms:
+    def __init__(self, window: float):
+        self.window: float = window
+        # the latest window of every key, earlier windows are only kept encoded
+        self.current: Dict[str, Tuple[float, Histogram]] = {}
+        self.closed: Dict[Tuple[str, float], bytes] = {}
+
+    def record(self, key: str, now: float, seconds: float):
+        start = now // self.window * self.window
+        current_start, histogram = self.current.get(key, (start, None))
+        if start < current_start:
+            # a value that finished before the latest one of its key, but was recorded after it
+            histogram = Histogram.decode(self.closed[key, start]) if (key, start) in self.closed else Histogram()
+            histogram.record(seconds)
+            self.closed[key, start] = histogram.encode()
+            return
+        if histogram is None or start > current_start:
+            if histogram is not None:
+                self.closed[key, current_start] = histogram.encode()
+            self.current[key] = start, (histogram := Histogram())
+        histogram.record(seconds)
+
+    def windows(self) -> Iterator[Tuple[str, float, Histogram]]:
+        # in chronological order, decoded one at a time
+        entries = [(start, key, data) for (key, start), data in self.closed.items()]
+        entries += [(start, key, histogram) for key, (start, histogram) in self.current.items()]
+        for start, key, entry in sorted(entries, key=lambda entry: entry[:2]):
+            yield key, start, Histogram.decode(entry) if isinstance(entry, bytes) else entry
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            for key, start, histogram in self.windows():
+                file.write(json.dumps({"key": key, "start": start, "histogram": histogram.to_base64()}) + "\n")
+
+
+def load(paths: List[str]) -> Dict[str, Histogram]:
+    merged: Dict[str, Histogram] = {}
+    for path in paths:
+        with open(path) as file:
+            for line in file:
+                window = json.loads(line)
+                histogram = Histogram.from_base64(window["histogram"])
+                if window["key"] in merged:
+                    merged[window["key"]].merge(histogram)
+                else:
+                    merged[window["key"]] = histogram
+    return merged
+
+
+if __name__ == "__main__":
+    from timing import format_table
+
+    rows = []
+    for key, histogram in sorted(load(sys.argv[1:]).items()):
+        stats = histogram.summary()
+        rows.append([key, stats["count"]] + [stats[p] * 1000 for p in ["mean", "p50", "p95", "p99", "max"]])
+    print(format_table(["endpoint", "count", "mean ms", "p50 ms", "p95 ms", "p99 ms", "max ms"], rows))
@@ -0,0 +1,128 @@
+import atexit
+import os
+import sys
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+from environment import METRICS_FILE, METRICS_INTERVAL, METRICS_PORT
+from timing import response_outcome
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        self.lock: Lock = Lock()
+        self.started: bool = False
+        self.stopped: Event = Event()
+        self.dumper: Optional[Thread] = None
+        self.requests: Counter = Counter()
+        # per endpoint: observations per bucket (not cumulative), the last one is +Inf
+        self.buckets: Dict[str, List[int]] = {}
+        self.sums: Counter = Counter()
+
+    def start(self):
+        self.started = True
+        if METRICS_PORT:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", METRICS_PORT), MetricsHandler)
+            except OSError as e:
+                # the file dump and the run itself still work without the HTTP endpoint
+                print(f"Could not serve metrics on port {METRICS_PORT}: {e}", file=sys.stderr, flush=True)
+            else:
+                Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if METRICS_FILE:
+            self.dumper = Thread(target=self.dump_periodically, name="metrics-file", daemon=True)
+            self.dumper.start()
+
+    def observed(self, endpoint: str, request: Callable, *args, **kwargs) -> dict:
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            response = request(*args, **kwargs)
+            outcome = response_outcome(response)
+            return response
+        except Exception as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            self.observe(endpoint, outcome, time.perf_counter() - start)
+
+    def observe(self, endpoint: str, outcome: str, latency: float):
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+        with self.lock:
+            self.requests[endpoint, outcome] += 1
+            self.buckets.setdefault(endpoint, [0] * (len(LATENCY_BUCKETS) + 1))[index] += 1
+            self.sums[endpoint] += latency
+
+    def render(self) -> str:
+        with self.lock:
+            requests = sorted(self.requests.items())
+            buckets = {endpoint: list(counts) for endpoint, counts in sorted(self.buckets.items())}
+            sums = dict(self.sums)
+
+        lines = [
+            "# TYPE cryptic_requests counter",
+            "# HELP cryptic_requests Requests sent by the harness by endpoint and outcome.",
+        ]
+        for (endpoint, outcome), count in requests:
+            lines.append(f'cryptic_requests_total{{endpoint="{label(endpoint)}",outcome="{label(outcome)}"}} {count}')
+        lines += [
+            "# TYPE cryptic_request_duration_seconds histogram",
+            "# UNIT cryptic_request_duration_seconds seconds",
+            "# HELP cryptic_request_duration_seconds Client side request latency by endpoint.",
+        ]
+        for endpoint, counts in buckets.items():
+            name = label(endpoint)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], counts):
+                cumulative += count
+                lines.append(f'cryptic_request_duration_seconds_bucket{{endpoint="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'cryptic_request_duration_seconds_count{{endpoint="{name}"}} {cumulative}')
+            lines.append(f'cryptic_request_duration_seconds_sum{{endpoint="{name}"}} {sums[endpoint]}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        # replace the file atomically so readers never see a partial exposition
+        with open(f"{METRICS_FILE}.tmp", "w") as file:
+            file.write(self.render())
+        os.replace(f"{METRICS_FILE}.tmp", METRICS_FILE)
+
+    def dump_periodically(self):
+        while not self.stopped.wait(METRICS_INTERVAL):
+            self.dump()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+metrics = Metrics()
+
+
+@atexit.register
+def dump_metrics():
+    metrics.stopped.set()
+    # a periodic dump still writing the temporary file would race with the final one
+    if metrics.dumper is not None:
+        metrics.dumper.join()
+    if METRICS_FILE and metrics.started:
+        metrics.dump()
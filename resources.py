@@ -0,0 +1,64 @@
+import os
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from environment import RESOURCE_TARGETS
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+# cpu seconds, rss bytes, threads, open file descriptors
+Usage = Tuple[float, int, int, int]
+
+
+def discover_targets() -> Dict[str, int]:
+    if RESOURCE_TARGETS:
+        return {name: int(pid) for name, pid in (target.split("=") for target in RESOURCE_TARGETS.split(","))}
+    # the main process of every running compose container
+    try:
+        names = subprocess.run(
+            ["docker", "ps", "--format", "{{.Names}}"], capture_output=True, text=True, check=True
+        ).stdout.split()
+        pids = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Pid}}"] + names, capture_output=True, text=True, check=True
+        ).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return {name: int(pid) for name, pid in zip(names, pids)}
+
+
+def cgroup_processes(pid: int) -> List[int]:
+    # all processes in the container, not only its entrypoint
+    try:
+        with open(f"/proc/{pid}/cgroup") as file:
+            path = next(line.split(":", 2)[2].strip() for line in file if line.startswith("0::"))
+        with open(f"/sys/fs/cgroup{path}/cgroup.procs") as file:
+            return [int(line) for line in file]
+    except (OSError, StopIteration):
+        return [pid]
+
+
+def process_usage(pid: int) -> Optional[Usage]:
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            fields = file.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as file:
+            status = dict(line.split(":", 1) for line in file)
+    except OSError:
+        return None
+    try:
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        # descriptors of processes owned by other users are not readable
+        fds = 0
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = int(status.get("VmRSS", "0 kB").split()[0]) * 1024
+    return cpu, rss, int(status["Threads"]), fds
+
+
+def sample_resources(targets: Dict[str, int]) -> Dict[str, Usage]:
+    samples = {}
+    for name, pid in targets.items():
+        usages = [usage for process in cgroup_processes(pid) if (usage := process_usage(process)) is not None]
+        if usages:
+            samples[name] = tuple(sum(values) for values in zip(*usages))
+    return samples
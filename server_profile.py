@@ -0,0 +1,124 @@
+import atexit
+import sys
+from collections import Counter
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from pymysql import Connection, MySQLError
+
+from database import connect_database
+from environment import DB_DATABASE, SERVER_QUERY_PROFILE
+from timing import format_table
+
+STATEMENT_COUNTERS = ["Com_select", "Com_insert", "Com_update", "Com_delete", "Com_replace"]
+READ_COUNTERS = [
+    "Handler_read_first",
+    "Handler_read_key",
+    "Handler_read_next",
+    "Handler_read_rnd",
+    "Handler_read_rnd_next",
+]
+
+# (statements, rows examined) per statement digest or per status counter
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class ServerQueryProfile:
+    def __init__(self):
+        self.lock: Lock = Lock()
+        self.connection: Optional[Connection] = None
+        self.use_digests: bool = False
+        self.overhead: Snapshot = {}
+        self.calls: Counter = Counter()
+        self.statements: Counter = Counter()
+        self.rows_examined: Counter = Counter()
+        self.full_scan_reads: Counter = Counter()
+        self.digests: Dict[str, Counter] = {}
+
+    def connect(self):
+        self.connection = connect_database(autocommit=True)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT @@performance_schema")
+                self.use_digests = bool(cursor.fetchone()[0])
+            if self.use_digests:
+                # reading the digest table may need privileges the test user does not have
+                self.snapshot()
+        except MySQLError:
+            self.use_digests = False
+        # statements and handler reads caused by taking the snapshots themselves
+        self.overhead = diff(self.snapshot(), self.snapshot())
+
+    def snapshot(self) -> Snapshot:
+        with self.connection.cursor() as cursor:
+            if self.use_digests:
+                cursor.execute(
+                    "SELECT DIGEST_TEXT, COUNT_STAR, SUM_ROWS_EXAMINED "
+                    "FROM performance_schema.events_statements_summary_by_digest "
+                    "WHERE SCHEMA_NAME=%s AND DIGEST_TEXT NOT LIKE %s",
+                    (DB_DATABASE, "%performance_schema%"),
+                )
+                return {text: (int(count), int(rows)) for text, count, rows in cursor.fetchall()}
+            names = STATEMENT_COUNTERS + READ_COUNTERS
+            cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({', '.join(['%s'] * len(names))})", names)
+            return {name: (int(value), 0) for name, value in cursor.fetchall()}
+
+    def profiled(self, endpoint: str, request: Callable, *args, **kwargs) -> dict:
+        # snapshots are global, so requests are serialized while the profile is recorded
+        with self.lock:
+            if self.connection is None:
+                self.connect()
+            before = self.snapshot()
+            try:
+                return request(*args, **kwargs)
+            finally:
+                self.record(endpoint, diff(before, self.snapshot()))
+
+    def record(self, endpoint: str, delta: Snapshot):
+        self.calls[endpoint] += 1
+        if self.use_digests:
+            for text, (count, rows) in delta.items():
+                self.statements[endpoint] += count
+                self.rows_examined[endpoint] += rows
+                self.digests.setdefault(endpoint, Counter())[text] += count
+            return
+        delta = {name: value - self.overhead.get(name, (0, 0))[0] for name, (value, _) in delta.items()}
+        self.statements[endpoint] += sum(max(0, delta.get(name, 0)) for name in STATEMENT_COUNTERS)
+        self.rows_examined[endpoint] += sum(max(0, delta.get(name, 0)) for name in READ_COUNTERS)
+        self.full_scan_reads[endpoint] += max(0, delta.get("Handler_read_rnd_next", 0))
+
+    def report(self) -> str:
+        rows = []
+        for endpoint, calls in sorted(self.calls.items()):
+            row = [endpoint, calls, self.statements[endpoint] / calls, self.rows_examined[endpoint] / calls]
+            if self.use_digests:
+                text, count = (self.digests.get(endpoint) or Counter({"": 0})).most_common(1)[0]
+                row += [count / calls, text[:80]]
+            else:
+                row.append(self.full_scan_reads[endpoint] / calls)
+            rows.append(row)
+        columns = ["endpoint", "calls", "statements/call", "rows examined/call"]
+        if self.use_digests:
+            columns += ["top statement/call", "top statement"]
+        else:
+            columns.append("rnd_next/call")
+        return format_table(columns, rows)
+
+
+def diff(before: Snapshot, after: Snapshot) -> Snapshot:
+    delta = {}
+    for key, (count, rows) in after.items():
+        old_count, old_rows = before.get(key, (0, 0))
+        if count != old_count or rows != old_rows:
+            delta[key] = (count - old_count, rows - old_rows)
+    return delta
+
+
+server_query_profile = ServerQueryProfile()
+
+
+@atexit.register
+def print_server_query_profile():
+    if SERVER_QUERY_PROFILE and server_query_profile.calls:
+        source = "statement digests" if server_query_profile.use_digests else "global status counters"
+        print(f"\nServer queries per endpoint ({source})\n{server_query_profile.report()}", file=sys.stderr, flush=True)
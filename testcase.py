@@ -1,8 +1,35 @@
+import atexit
+import sys
 import unittest
+from functools import partial
 from typing import List
 
+from environment import HARNESS_PROFILE, HISTOGRAM_FILE, METRICS_FILE, METRICS_PORT, REQUEST_TIMINGS, TRACE_FILE
+from harness_profile import harness_profile
+from metrics import metrics
+from timing import request_timings
+from tracing import tracer
+
+if HARNESS_PROFILE:
+    harness_profile.start()
+if METRICS_PORT or METRICS_FILE:
+    metrics.start()
+
 
 class TestCase(unittest.TestCase):
+    def run(self, result=None):
+        request_timings.enabled = REQUEST_TIMINGS
+        try:
+            if TRACE_FILE:
+                for phase in ["setUp", "tearDown"]:
+                    setattr(
+                        self, phase, partial(tracer.traced, phase, "fixture", {"test": self.id()}, getattr(self, phase))
+                    )
+                return tracer.traced(self.id(), "test", {}, super().run, result)
+            return super().run(result)
+        finally:
+            request_timings.enabled = False
+
     def assert_valid_uuid(self, text: str):
         self.assertIsInstance(text, str)
         self.assertRegex(text, r"^[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12}$")
@@ -10,3 +37,11 @@ class TestCase(unittest.TestCase):
     def assert_dict_with_keys(self, obj: dict, keys: List[str]):
         self.assertIsInstance(obj, dict)
         self.assertEqual(sorted(keys), sorted(obj))
+
+
+@atexit.register
+def print_request_timings():
+    if request_timings.latencies:
+        print(f"\nRequest timings\n{request_timings.report()}", file=sys.stderr, flush=True)
+    if HISTOGRAM_FILE and request_timings.latencies:
+        request_timings.windows.dump(HISTOGRAM_FILE)
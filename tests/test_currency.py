@@ -9,7 +9,7 @@ from PyCrypCli.exceptions import (
 )
 from PyCrypCli.game_objects import Wallet
 
-from database import execute
+from database import execute, execute_many
 from testcase import TestCase
 from tests.test_server import setup_account, super_password, super_uuid
 from tests.test_shop import clear_wallets, create_wallet
@@ -19,6 +19,7 @@ from util import get_client, uuid
 def create_transactions(wallet_uuid, n=1, amount=20):
     clear_transactions()
     now = datetime.utcnow()
+    rows = []
     for i in range(n):
         if i % 2 == 0:
             source_uuid = wallet_uuid
@@ -27,17 +28,15 @@ def create_transactions(wallet_uuid, n=1, amount=20):
             source_uuid = uuid()
             destination_uuid = wallet_uuid
 
-        execute(
-            "INSERT INTO currency_transaction "
-            "(id, time_stamp, source_uuid, send_amount, destination_uuid, `usage`, origin) "
-            "VALUES (%s, %s, %s, %s, %s, %s, 0)",
-            i + 1,
-            now + timedelta(minutes=i),
-            source_uuid,
-            amount,
-            destination_uuid,
-            f"test transaction #{i + 1}",
+        rows.append(
+            (i + 1, now + timedelta(minutes=i), source_uuid, amount, destination_uuid, f"test transaction #{i + 1}", 0)
         )
+    execute_many(
+        "INSERT INTO currency_transaction "
+        "(id, time_stamp, source_uuid, send_amount, destination_uuid, `usage`, origin) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        rows,
+    )
 
 
 def clear_transactions():
@@ -13,7 +13,7 @@ from PyCrypCli.exceptions import (
     CanNotMoveDirIntoItselfException,
 )
 
-from database import execute
+from database import execute, execute_many
 from testcase import TestCase
 from tests.test_device import setup_device
 from tests.test_server import setup_account, super_password
@@ -23,26 +23,20 @@ from util import get_client, uuid
 def create_files(device_uuids: List, n=1, is_directory=False, parent_uuid=None, clear_all_files=True) -> List[str]:
     if clear_all_files:
         clear_files()
-    file_uuids = []
+    rows = []
     for device in device_uuids:
         for i in range(n):
-            file_uuid = uuid()
             if is_directory is False:
                 content = f"test{i + 1}"
             else:
                 content = ""
-            execute(
-                "INSERT INTO device_file(uuid, device,filename,content,is_directory,parent_dir_uuid) VALUES "
-                + "(%s,%s,%s,%s,%s,%s)",
-                file_uuid,
-                device,
-                f"test{i + 1}",
-                content,
-                is_directory,
-                parent_uuid,
-            )
-            file_uuids.append(file_uuid)
-    return file_uuids
+            rows.append((uuid(), device, f"test{i + 1}", content, is_directory, parent_uuid))
+    execute_many(
+        "INSERT INTO device_file(uuid, device,filename,content,is_directory,parent_dir_uuid) VALUES "
+        + "(%s,%s,%s,%s,%s,%s)",
+        rows,
+    )
+    return [row[0] for row in rows]
 
 
 def clear_files():
@@ -0,0 +1,114 @@
+import os
+import random
+from tempfile import TemporaryDirectory
+
+from histogram import Histogram, HIGHEST_TRACKABLE, WindowedHistograms, load
+from testcase import TestCase
+from timing import percentile
+
+
+def random_latencies(n: int) -> list:
+    generator = random.Random(42)
+    return [generator.lognormvariate(-4, 1) for _ in range(n)]
+
+
+def histogram_of(values: list, **kwargs) -> Histogram:
+    histogram = Histogram(**kwargs)
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+class TestHistogram(TestCase):
+    def test_encode_decode(self):
+        histogram = histogram_of(random_latencies(10000) + [0, HIGHEST_TRACKABLE])
+
+        decoded = Histogram.decode(histogram.encode())
+        self.assertEqual(histogram.layout(), decoded.layout())
+        self.assertEqual(list(histogram.counts), list(decoded.counts))
+        self.assertEqual(histogram.total, decoded.total)
+        self.assertEqual(list(histogram.counts), list(Histogram.from_base64(histogram.to_base64()).counts))
+
+    def test_encode_empty(self):
+        decoded = Histogram.decode(Histogram().encode())
+        self.assertEqual(0, len(decoded))
+        self.assertEqual(0.0, decoded.summary()["max"])
+
+    def test_encode_is_compact(self):
+        self.assertLess(len(histogram_of(random_latencies(100000)).encode()), 4096)
+
+    def test_decode_invalid(self):
+        with self.assertRaises(ValueError):
+            Histogram.decode(b"nope" + bytes(10))
+
+    def test_merge(self):
+        values = random_latencies(2000)
+        merged = histogram_of(values[:1000])
+        merged.merge(Histogram.decode(histogram_of(values[1000:]).encode()))
+
+        self.assertEqual(list(histogram_of(values).counts), list(merged.counts))
+        self.assertEqual(2000, len(merged))
+
+    def test_merge_different_precision(self):
+        with self.assertRaises(ValueError):
+            Histogram().merge(Histogram(significant_figures=3))
+        with self.assertRaises(ValueError):
+            Histogram().merge(Histogram(decimals=0))
+
+    def test_percentile_error(self):
+        values = random_latencies(50000)
+        histogram = histogram_of(values)
+
+        for p in [1, 50, 90, 95, 99, 99.9]:
+            exact = percentile(values, p)
+            self.assertAlmostEqual(exact, histogram.percentile(p), delta=exact * 0.01 + 1e-6)
+        self.assertAlmostEqual(max(values), histogram.summary()["max"], delta=max(values) * 0.01)
+        self.assertAlmostEqual(sum(values) / len(values), histogram.summary()["mean"], delta=0.001)
+
+    def test_out_of_range(self):
+        histogram = histogram_of([-1, 10 * HIGHEST_TRACKABLE])
+        self.assertEqual(2, len(histogram))
+        self.assertEqual(0.0, histogram.percentile(0))
+        self.assertEqual(((1 << histogram.highest_bits) - 1) / 10**6, histogram.percentile(100))
+
+    def test_whole_numbers(self):
+        values = list(range(1, 101))
+        histogram = histogram_of(values, decimals=0)
+        self.assertEqual(percentile(values, 50), histogram.percentile(50))
+        self.assertEqual(100, histogram.summary()["max"])
+
+
+class TestWindowedHistograms(TestCase):
+    def test_windows(self):
+        windows = WindowedHistograms(1.0)
+        for now in [0.1, 0.2, 1.5, 3.2]:
+            windows.record("device/info", now, 0.01)
+        windows.record("device/all", 2.5, 0.01)
+
+        self.assertEqual(
+            [("device/info", 0.0, 2), ("device/info", 1.0, 1), ("device/all", 2.0, 1), ("device/info", 3.0, 1)],
+            [(key, start, len(histogram)) for key, start, histogram in windows.windows()],
+        )
+
+    def test_out_of_order(self):
+        windows = WindowedHistograms(1.0)
+        for now in [0.5, 1.001, 0.999, 1.2, 0.3]:
+            windows.record("", now, now)
+
+        result = [(start, len(histogram)) for _, start, histogram in windows.windows()]
+        self.assertEqual([(0.0, 3), (1.0, 2)], result)
+
+    def test_dump_and_load(self):
+        windows = WindowedHistograms(1.0)
+        for now, value in enumerate(random_latencies(100)):
+            windows.record("device/info", now / 10, value)
+        windows.record("device/all", 0.0, 0.5)
+
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "histograms.jsonl")
+            windows.dump(path)
+            merged = load([path, path])
+
+        self.assertEqual(["device/all", "device/info"], sorted(merged))
+        self.assertEqual(200, len(merged["device/info"]))
+        self.assertAlmostEqual(0.5, merged["device/all"].percentile(50), delta=0.005)
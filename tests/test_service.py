@@ -14,7 +14,7 @@ from PyCrypCli.exceptions import (
     WalletNotFoundException,
 )
 
-from database import execute
+from database import execute, execute_many
 from testcase import TestCase
 from tests.test_device import setup_device
 from tests.test_server import setup_account, super_password, super_uuid
@@ -25,21 +25,15 @@ def create_service(device, name="telnet", n=1, part_owner=None, owner=super_uuid
     if clear_service:
         clear_services()
 
-    service_uuids = []
-    for i in range(n):
-        service_uuids.append(uuid())
-        execute(
-            "INSERT INTO service_service (uuid, device, owner, name, running, running_port, part_owner, speed) "
-            "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
-            service_uuids[i],
-            device,
-            owner,
-            name,
-            i % 2 == 0,
-            1337,
-            part_owner,
-            speed,
-        )
+    service_uuids = [uuid() for _ in range(n)]
+    execute_many(
+        "INSERT INTO service_service (uuid, device, owner, name, running, running_port, part_owner, speed) "
+        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
+        [
+            (service_uuid, device, owner, name, i % 2 == 0, 1337, part_owner, speed)
+            for i, service_uuid in enumerate(service_uuids)
+        ],
+    )
 
     return service_uuids
 
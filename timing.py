@@ -0,0 +1,88 @@
+import time
+from threading import Lock
+from typing import Dict, List, Sequence, Union
+
+from environment import HISTOGRAM_WINDOW
+from histogram import Histogram, WindowedHistograms
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(latencies: Union[Sequence[float], Histogram]) -> dict:
+    if isinstance(latencies, Histogram):
+        return latencies.summary()
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+    }
+
+
+def format_table(columns: List[str], rows: List[list]) -> str:
+    cells = [columns] + [[f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def endpoint_name(data: dict) -> str:
+    if "ms" in data:
+        return "/".join([data["ms"]] + list(data.get("endpoint", [])))
+    return data.get("action", "unknown")
+
+
+def response_outcome(response: dict) -> str:
+    if "error" in response:
+        return response["error"]
+    data = response.get("data")
+    if isinstance(data, dict) and "error" in data:
+        return data["error"]
+    return "ok"
+
+
+class RequestTimings:
+    def __init__(self):
+        self.enabled: bool = False
+        self.lock: Lock = Lock()
+        self.latencies: Dict[str, Histogram] = {}
+        self.windows: WindowedHistograms = WindowedHistograms(HISTOGRAM_WINDOW)
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, outcome: str, latency: float):
+        with self.lock:
+            self.latencies.setdefault(endpoint, Histogram()).record(latency)
+            self.windows.record(endpoint, time.time(), latency)
+            if outcome != "ok":
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def timed(self, endpoint: str, request, *args, **kwargs) -> dict:
+        start = time.perf_counter()
+        try:
+            response = request(*args, **kwargs)
+        except Exception as e:
+            self.record(endpoint, type(e).__name__, time.perf_counter() - start)
+            raise
+        self.record(endpoint, response_outcome(response), time.perf_counter() - start)
+        return response
+
+    def report(self) -> str:
+        rows = []
+        for endpoint, latencies in sorted(self.latencies.items()):
+            stats = summarize(latencies)
+            rows.append(
+                [endpoint, stats["count"], self.errors.get(endpoint, 0)]
+                + [stats[key] * 1000 for key in ["mean", "p95", "max"]]
+            )
+        return format_table(["endpoint", "count", "errors", "mean ms", "p95 ms", "max ms"], rows)
+
+
+request_timings = RequestTimings()
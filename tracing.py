@@ -0,0 +1,57 @@
+import atexit
+import json
+import os
+import sys
+import time
+from threading import Lock, current_thread, get_ident
+from typing import Callable, Dict, List
+
+from environment import TRACE_FILE
+
+
+class Tracer:
+    def __init__(self):
+        self.lock: Lock = Lock()
+        self.origin: float = time.perf_counter()
+        self.events: List[dict] = []
+        self.threads: Dict[int, str] = {}
+
+    def add(self, name: str, category: str, start: float, end: float, **args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": get_ident(),
+            "args": args,
+        }
+        with self.lock:
+            self.threads.setdefault(event["tid"], current_thread().name)
+            self.events.append(event)
+
+    def traced(self, name: str, category: str, args: dict, func: Callable, *func_args, **func_kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*func_args, **func_kwargs)
+        finally:
+            self.add(name, category, start, time.perf_counter(), **args)
+
+    def trace(self) -> dict:
+        threads = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in self.threads.items()
+        ]
+        return {"traceEvents": threads + self.events, "displayTimeUnit": "ms"}
+
+
+tracer = Tracer()
+
+
+@atexit.register
+def write_trace():
+    if TRACE_FILE and tracer.events:
+        with open(TRACE_FILE, "w") as file:
+            json.dump(tracer.trace(), file)
+        print(f"\nWrote {len(tracer.events)} trace events to {TRACE_FILE}", file=sys.stderr, flush=True)
@@ -1,12 +1,50 @@
+from functools import partial
 from uuid import uuid4
 
 from PyCrypCli.client import Client
 
-from environment import SERVER_LOCATION
+from environment import (
+    EXPLAIN_QUERIES,
+    METRICS_FILE,
+    METRICS_PORT,
+    SERVER_LOCATION,
+    SERVER_QUERY_PROFILE,
+    TRACE_FILE,
+    WIRE_STATS,
+)
+from explain_profile import explain_profile
+from metrics import metrics
+from server_profile import server_query_profile
+from timing import endpoint_name, request_timings
+from tracing import tracer
+from wire import wire_traffic
+
+
+class TimedClient(Client):
+    def init(self):
+        super().init()
+        if WIRE_STATS:
+            wire_traffic.attach(self.websocket)
+
+    def request(self, data: dict, no_response: bool = False) -> dict:
+        send = super().request
+        if request_timings.enabled:
+            send = partial(request_timings.timed, endpoint_name(data), send)
+        if METRICS_PORT or METRICS_FILE:
+            send = partial(metrics.observed, endpoint_name(data), send)
+        if TRACE_FILE:
+            send = partial(tracer.traced, endpoint_name(data), "request", {"tag": data.get("tag", "")}, send)
+        if WIRE_STATS:
+            send = partial(wire_traffic.counted, endpoint_name(data), send)
+        if SERVER_QUERY_PROFILE and "ms" in data:
+            send = partial(server_query_profile.profiled, endpoint_name(data), send)
+        if EXPLAIN_QUERIES and "ms" in data:
+            send = partial(explain_profile.captured, endpoint_name(data), send)
+        return send(data, no_response)
 
 
 def get_client() -> Client:
-    return Client(SERVER_LOCATION)
+    return TimedClient(SERVER_LOCATION)
 
 
 def uuid() -> str:
@@ -0,0 +1,111 @@
+import atexit
+import json
+import os
+import sys
+from threading import Lock, local
+from typing import Callable, Dict, List
+
+from websocket import ABNF, WebSocket
+
+from environment import WIRE_BASELINE, WIRE_BASELINE_TOLERANCE, WIRE_STATS
+from histogram import Histogram
+from timing import format_table, summarize
+
+
+def frame_size(frame: ABNF) -> int:
+    length = len(frame.data)
+    header = 2 + (0 if length < 126 else 2 if length < 1 << 16 else 8)
+    return header + (4 if frame.mask else 0) + length
+
+
+class WireTraffic:
+    def __init__(self):
+        self.lock: Lock = Lock()
+        # [sent bytes, sent frames, received bytes, received frames] of the request running in this thread
+        self.current: local = local()
+        # sizes and frame counts are whole numbers, so the histograms keep no decimals
+        self.request_bytes: Dict[str, Histogram] = {}
+        self.response_bytes: Dict[str, Histogram] = {}
+        self.frames: Dict[str, Histogram] = {}
+
+    def attach(self, websocket: WebSocket):
+        send_frame, recv_frame = websocket.send_frame, websocket.recv_frame
+
+        def counted_send_frame(frame: ABNF) -> int:
+            self.count(0, frame)
+            return send_frame(frame)
+
+        def counted_recv_frame() -> ABNF:
+            frame = recv_frame()
+            self.count(2, frame)
+            return frame
+
+        # WebSocket.send and WebSocket.recv look these up on the instance, which includes pings and pongs
+        websocket.send_frame = counted_send_frame
+        websocket.recv_frame = counted_recv_frame
+
+    def count(self, offset: int, frame: ABNF):
+        counts = getattr(self.current, "counts", None)
+        if counts is not None:
+            counts[offset] += frame_size(frame)
+            counts[offset + 1] += 1
+
+    def counted(self, endpoint: str, request: Callable, *args, **kwargs) -> dict:
+        self.current.counts = counts = [0, 0, 0, 0]
+        try:
+            return request(*args, **kwargs)
+        finally:
+            self.current.counts = None
+            with self.lock:
+                self.request_bytes.setdefault(endpoint, Histogram(decimals=0)).record(counts[0])
+                self.response_bytes.setdefault(endpoint, Histogram(decimals=0)).record(counts[2])
+                self.frames.setdefault(endpoint, Histogram(decimals=0)).record(counts[1] + counts[3])
+
+    def report(self) -> str:
+        rows = []
+        for endpoint, sizes in sorted(self.response_bytes.items()):
+            stats = summarize(sizes)
+            rows.append(
+                [endpoint, stats["count"], summarize(self.request_bytes[endpoint])["mean"]]
+                + [stats[key] for key in ["mean", "p50", "p95", "max"]]
+                + [summarize(self.frames[endpoint])["mean"]]
+            )
+        return format_table(
+            ["endpoint", "count", "sent B", "received B", "p50 B", "p95 B", "max B", "frames/call"], rows
+        )
+
+    def baseline(self) -> Dict[str, float]:
+        return {endpoint: sizes.percentile(95) for endpoint, sizes in sorted(self.response_bytes.items())}
+
+    def regressions(self, baseline: Dict[str, float]) -> List[list]:
+        rows = []
+        for endpoint, size in self.baseline().items():
+            if endpoint in baseline and size > baseline[endpoint] * (1 + WIRE_BASELINE_TOLERANCE):
+                rows.append([endpoint, baseline[endpoint], size, size / max(baseline[endpoint], 1)])
+        return rows
+
+
+wire_traffic = WireTraffic()
+
+
+@atexit.register
+def print_wire_traffic():
+    if not WIRE_STATS or not wire_traffic.response_bytes:
+        return
+    print(f"\nWire traffic per endpoint\n{wire_traffic.report()}", file=sys.stderr, flush=True)
+    if not WIRE_BASELINE:
+        return
+    if not os.path.exists(WIRE_BASELINE):
+        with open(WIRE_BASELINE, "w") as file:
+            json.dump(wire_traffic.baseline(), file, indent=2)
+        print(f"Wrote response size baseline to {WIRE_BASELINE}", file=sys.stderr, flush=True)
+        return
+    with open(WIRE_BASELINE) as file:
+        regressions = wire_traffic.regressions(json.load(file))
+    if regressions:
+        print(
+            f"\nWARNING: p95 response size grew more than {WIRE_BASELINE_TOLERANCE:.0%} over {WIRE_BASELINE}\n"
+            + format_table(["endpoint", "baseline B", "p95 B", "growth"], regressions),
+            file=sys.stderr,
+            flush=True,
+        )